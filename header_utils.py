@@ -11,7 +11,13 @@ Default header transformations:
 Optional header transformations
     -> change_pragma_one_to_header_guards
 
+Optional include analysis
+    -> remove_redundant_includes (duplicate or transitively implied includes)
+
 Additional Features:
+    - generate a topologically sorted all-includes file and binder config
+    - process multiple include roots in one pass into a unified graph
+    - compact (CSR) include graph which can be saved and memory-mapped
     - generate graph of header references in [png|svg|pdf|dot] format
 
 repo: <https://github.com/shakfu/header_utils>
@@ -19,11 +25,14 @@ repo: <https://github.com/shakfu/header_utils>
 """
 import argparse
 import logging
+import mmap
 import os
 import re
 import shutil
+import struct
 import sys
-from typing import ClassVar
+from array import array
+from typing import ClassVar, Iterable, NamedTuple, Optional
 
 try:
     import graphviz  # type: ignore
@@ -32,9 +41,9 @@ except ImportError:
     HAVE_GRAPHVIZ = False
 
 
-__version__ = "0.1.1"
+__version__ = "0.1.2"
 
-__all__ = ['HeaderProcessor']
+__all__ = ['HeaderProcessor', 'IncludeGraph', 'IncludeRoot']
 
 DEBUG = False
 
@@ -72,6 +81,273 @@ logging.basicConfig(
     handlers=[__handler]
 )
 
+class IncludeRoot(NamedTuple):
+    """An include tree to be processed
+
+    Args:
+        input_dir  (str): Directory containing source headers.
+        output_dir (str): Directory for changed headers.
+                          (defaults to the processor's output_dir)
+        prefix     (str): Include path prefix of headers in this root.
+    """
+
+    input_dir: str
+    output_dir: Optional[str] = None
+    prefix: str = ""
+
+
+class Include(NamedTuple):
+    """An include statement of a header
+
+    Args:
+        target       (str): Absolute reference of the included header.
+        conditional (bool): Included inside an `#if` block (header guards excluded).
+    """
+
+    target: str
+    conditional: bool = False
+
+
+class IncludeGraph:
+    """Compact include graph in compressed sparse row (CSR) form
+
+    Node ids are interned to ints: the processed headers come first
+    (ids < n_headers), followed by included headers outside the processed
+    roots (e.g. system headers). Every include statement is an edge, in
+    file order. The edges of node `n` are `offsets[n]` to `offsets[n + 1]`
+    in `targets`; `conditional[e]` is 1 if edge `e` is inside an `#if` block.
+
+    A graph is created for the names of the headers to be processed and
+    filled in that order with `add_header`, so no per-include objects are
+    kept. Memory: 5 bytes per include statement (4 byte target + 1 byte
+    flag) and 4 bytes per header (offset), plus the node names. A graph
+    loaded with `load` maps the arrays from disk without copying them.
+
+    Args:
+        names       ([str]): Node names indexed by node id.
+        n_headers     (int): Number of processed headers (defaults to len(names)).
+        offsets  (array[I]): Edge offsets per node.
+        targets  (array[I]): Edge targets.
+        conditional (array[B]): Edge conditional flags.
+    """
+
+    __slots__ = (
+        "names", "n_headers", "offsets", "targets", "conditional", "_ids", "_buffer"
+    )
+
+    MAGIC: ClassVar[bytes] = b"HUIG"
+    VERSION: ClassVar[int] = 1
+    HEADER: ClassVar = struct.Struct("=4sIIIII")
+
+    def __init__(
+        self,
+        names: Iterable[str] = (),
+        n_headers: Optional[int] = None,
+        offsets=None,
+        targets=None,
+        conditional=None,
+    ):
+        self.names = list(names)
+        self.n_headers = len(self.names) if n_headers is None else n_headers
+        self.offsets = array("I", [0]) if offsets is None else offsets
+        self.targets = array("I") if targets is None else targets
+        self.conditional = array("B") if conditional is None else conditional
+        self._ids: Optional[dict[str, int]] = None
+        self._buffer: Optional[mmap.mmap] = None
+
+    def __enter__(self) -> "IncludeGraph":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        """Release the memory-mapped file of a graph loaded with `load`
+
+        The edge and offset arrays are empty afterwards.
+        """
+        if self._buffer is None:
+            return
+        for view in (self.offsets, self.targets, self.conditional):
+            view.release()
+        self.offsets = array("I", [0])
+        self.targets = array("I")
+        self.conditional = array("B")
+        self._buffer.close()
+        self._buffer = None
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    @property
+    def n_edges(self) -> int:
+        """Number of edges"""
+        return len(self.targets)
+
+    @property
+    def ids(self) -> dict[str, int]:
+        """Node ids by name"""
+        if self._ids is None:
+            self._ids = {name: i for i, name in enumerate(self.names)}
+        return self._ids
+
+    def intern(self, name: str) -> int:
+        """Returns the node id of name, adding a node if needed"""
+        ids = self.ids
+        node = ids.get(name)
+        if node is None:
+            node = ids[name] = len(self.names)
+            self.names.append(name)
+        return node
+
+    def add_header(self, name: str, includes: Iterable[tuple[str, bool]]):
+        """Append the edges of a processed header
+
+        Headers must be added in node id order (skipped headers get no edges).
+        `includes` are (target, conditional) pairs, e.g. `Include` records.
+        """
+        node = self.ids.get(name)
+        if node is None or node >= self.n_headers:
+            raise ValueError(f"'{name}' is not a header of this graph")
+        rows = len(self.offsets) - 1
+        if node < rows:
+            raise ValueError(f"includes of '{name}' already added")
+        self.offsets.extend([len(self.targets)] * (node - rows))
+        for target, conditional in includes:
+            self.targets.append(self.intern(target))
+            self.conditional.append(conditional)
+        self.offsets.append(len(self.targets))
+
+    def row(self, node: int) -> tuple[int, int]:
+        """Returns the (start, end) edge range of node"""
+        if node + 1 < len(self.offsets):
+            return self.offsets[node], self.offsets[node + 1]
+        return 0, 0
+
+    def successors(self, node: int, conditional: bool = True) -> list[int]:
+        """Returns the ids of the headers included by node
+
+        Conditional includes are left out if conditional is False.
+        """
+        start, end = self.row(node)
+        if conditional:
+            return self.targets[start:end].tolist()
+        flags = self.conditional[start:end].tolist()
+        return [t for t, f in zip(self.targets[start:end].tolist(), flags) if not f]
+
+    def components(
+        self, conditional: bool = True, start: Optional[Iterable[int]] = None
+    ) -> list[list[int]]:
+        """Strongly connected components (include cycles) of the graph
+
+        Components are ordered dependencies first: every component comes
+        after the components it includes. Nodes are visited in start order
+        (defaults to node id order).
+        Conditional includes are left out if conditional is False.
+        """
+        offsets, targets, flags = self.offsets, self.targets, self.conditional
+        rows = len(offsets) - 1
+
+        # iterative Tarjan over the CSR arrays: work items are (node, next edge),
+        # components are completed successors first
+        index = [-1] * len(self.names)
+        low = [0] * len(self.names)
+        on_stack = [False] * len(self.names)
+        stack: list[int] = []
+        components: list[list[int]] = []
+        counter = 0
+        for root in range(len(self.names)) if start is None else start:
+            if index[root] != -1:
+                continue
+            work = [(root, -1)]
+            while work:
+                node, edge = work.pop()
+                if edge == -1:
+                    index[node] = low[node] = counter
+                    counter += 1
+                    stack.append(node)
+                    on_stack[node] = True
+                    edge = offsets[node] if node < rows else 0
+                end = offsets[node + 1] if node < rows else 0
+                if not conditional:
+                    while edge < end and flags[edge]:
+                        edge += 1
+                if edge < end:
+                    work.append((node, edge + 1))
+                    succ = targets[edge]
+                    if index[succ] == -1:
+                        work.append((succ, -1))
+                    elif on_stack[succ]:
+                        low[node] = min(low[node], index[succ])
+                    continue
+                if work:
+                    parent = work[-1][0]
+                    low[parent] = min(low[parent], low[node])
+                if low[node] != index[node]:
+                    continue
+                members = []
+                while True:
+                    member = stack.pop()
+                    on_stack[member] = False
+                    members.append(member)
+                    if member == node:
+                        break
+                components.append(members)
+        return components
+
+    def edges(self):
+        """Iterate over all (source, target) name pairs"""
+        for node in range(len(self.names)):
+            for succ in self.successors(node):
+                yield self.names[node], self.names[succ]
+
+    def nbytes(self) -> int:
+        """Returns the size of the edge and offset arrays in bytes"""
+        arrays = (self.offsets, self.targets, self.conditional)
+        return sum(len(a) * a.itemsize for a in arrays)
+
+    def save(self, path: str):
+        """Write graph to path (native byte order)"""
+        names = "\0".join(self.names).encode("utf-8")
+        with open(path, "wb") as fwrite:
+            fwrite.write(self.HEADER.pack(self.MAGIC, self.VERSION, len(self.names),
+                self.n_headers, len(self.targets), len(names)))
+            fwrite.write(bytes(self.offsets))
+            # nodes without edges have no offsets in memory
+            padding = len(self.names) + 1 - len(self.offsets)
+            fwrite.write(bytes(array("I", [len(self.targets)] * padding)))
+            fwrite.write(bytes(self.targets))
+            fwrite.write(bytes(self.conditional))
+            fwrite.write(names)
+
+    @classmethod
+    def load(cls, path: str) -> "IncludeGraph":
+        """Memory-map a graph written by `save`
+
+        The edge and offset arrays are zero-copy views of the mapped file,
+        which stays mapped until `close` is called (or the `with` block ends).
+        """
+        with open(path, "rb") as fopen:
+            buffer = mmap.mmap(fopen.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, n_nodes, n_headers, n_edges, n_names = cls.HEADER.unpack_from(buffer)
+        if magic != cls.MAGIC or version != cls.VERSION:
+            raise ValueError(f"'{path}' is not an include graph (version {cls.VERSION})")
+        view = memoryview(buffer)
+        start = cls.HEADER.size
+        end = start + 4 * (n_nodes + 1)
+        offsets = view[start:end].cast("I")
+        start, end = end, end + 4 * n_edges
+        targets = view[start:end].cast("I")
+        start, end = end, end + n_edges
+        conditional = view[start:end]
+        names = bytes(view[end : end + n_names]).decode("utf-8")
+        view.release()
+        graph = cls(names.split("\0") if n_nodes else [], n_headers,
+            offsets, targets, conditional)
+        graph._buffer = buffer
+        return graph
+
+
 class HeaderProcessor:
     """Recursively processes header declarations for binder
 
@@ -83,10 +359,28 @@ class HeaderProcessor:
         header_guards   (bool): Activate `#pragma once` to header guards transform.
         dry_run         (bool): Process headers without changing anything.
         force_overwrite (bool): Force overwrite output_dir if it already exists.
+        roots  ([IncludeRoot]): Additional include roots processed in the same
+                                pass, sharing the header index, include
+                                resolution cache and dependency graph.
+        remove_redundant (bool): Remove duplicate and transitively implied includes.
+        all_includes     (str): Path for the topologically sorted all-includes file.
+        binder_config    (str): Path for the skeleton binder config.
+        prefix           (str): Include path prefix of input_dir headers.
     """
 
     PATTERN: ClassVar = re.compile(r"^#include \"(.+)\"")
+    INCLUDE_PATTERN: ClassVar = re.compile(r"^#include\s*([<\"])(.+?)[>\"]")
+    CONDITIONAL_PATTERN: ClassVar = re.compile(r"^\s*#\s*(if|ifdef|ifndef|elif|else|endif)\b")
     DEFAULT_HEADER_ENDINGS: ClassVar[list[str]] = [".h", ".hpp", ".hh"]
+    PYBIND11_INCLUDES: ClassVar[dict[str, list[str]]] = {
+        "pybind11/stl.h": [
+            "array", "deque", "list", "map", "optional", "set",
+            "unordered_map", "unordered_set", "valarray", "variant", "vector",
+        ],
+        "pybind11/functional.h": ["functional"],
+        "pybind11/chrono.h": ["chrono"],
+        "pybind11/complex.h": ["complex"],
+    }
 
     def __init__(
         self,
@@ -96,6 +390,11 @@ class HeaderProcessor:
         header_guards: bool = False,
         dry_run: bool = False,
         force_overwrite: bool = False,
+        roots: list[IncludeRoot] = None,  # type: ignore
+        remove_redundant: bool = False,
+        all_includes: str = None,  # type: ignore
+        binder_config: str = None,  # type: ignore
+        prefix: str = "",
     ):
         self.input_dir = input_dir
         self.output_dir = output_dir
@@ -105,73 +404,186 @@ class HeaderProcessor:
         self.header_guards = header_guards
         self.dry_run = dry_run
         self.force_overwrite = force_overwrite
-        if HAVE_GRAPHVIZ:
-            self.graph = graphviz.Digraph("dependencies", comment="Header References")
-        else:
-            self.graph = None
+        self.remove_redundant = remove_redundant
+        self.all_includes = all_includes
+        self.binder_config = binder_config
+        self._include_graph: Optional[IncludeGraph] = None
+        self._graph = None
         self.log = logging.getLogger(self.__class__.__name__)
-        if not os.path.exists(input_dir):
-            self.log.error("provided input_dir argument '%s' does not exist", input_dir)
-            sys.exit(1)
+        self.roots = [IncludeRoot(input_dir, output_dir, prefix)]
+        for root in roots or []:
+            root = IncludeRoot(*root)
+            if not root.output_dir:
+                root = root._replace(output_dir=output_dir)
+            self.roots.append(root)
+        for root in self.roots:
+            if not os.path.exists(root.input_dir):
+                self.log.error(
+                    "provided input_dir argument '%s' does not exist", root.input_dir
+                )
+                sys.exit(1)
+        self._index: Optional[dict[str, tuple[IncludeRoot, str]]] = None
+        self._shadowed: list[tuple[IncludeRoot, str]] = []
+        self._resolved: dict[tuple[str, str], str] = {}
+        self._unresolved: set[str] = set()
 
     def process_headers(self):
         """Main process to recursively transform copy of input_dir headers
         and write them to output_dir.
 
-        Does not write changes if .dry_run is True
+        All include roots are processed in a single pass.
+        Does not write changes if .dry_run is True. The all-includes file
+        and binder config are reports (like the graph) and are written
+        in dry-run mode too.
         """
         self.log.info("START: transforming headers in '%s' to '%s'",
             self.input_dir, self.output_dir)
+        # the include roots may have changed since a previous run
+        self._index = None
+        self._resolved = {}
+        self._unresolved = set()
         if self.dry_run:
             self.log.info("DRY-RUN MODE: ON")
         if not self.dry_run:
-            if not self.output_dir:
-                self.log.warning("Must provide output_dir if dry-run is False")
-                sys.exit(1)
-            shutil.copytree(self.input_dir, self.output_dir,
-                dirs_exist_ok=self.force_overwrite,
-            )
+            copied = set()
+            for root in self.roots:
+                if not root.output_dir:
+                    self.log.warning("Must provide output_dir if dry-run is False")
+                    sys.exit(1)
+                destination = self.get_output_path(root)
+                shutil.copytree(root.input_dir, destination,
+                    dirs_exist_ok=self.force_overwrite or destination in copied,
+                )
+                copied.add(destination)
+            self._remove_shadowed_headers()
 
-        for header_path in self.get_headers():
-            base_path = self.get_base_path(header_path)
+        # redundant includes are only known once all headers are processed
+        _results = {}
+        self._include_graph = IncludeGraph(self.get_index())
+        self._graph = None
+        for base_path, (root, header_path) in self.get_index().items():
             self.log.info(base_path)
             with open(header_path, encoding="utf-8") as fopen:
                 lines = fopen.readlines()
             _result = self.transform(lines, base_path)
-            if not self.dry_run:
-                header_path = os.path.join(self.output_dir, base_path)
-                with open(header_path, "w", encoding="utf-8") as fwrite:
-                    fwrite.writelines(_result)
+            self._include_graph.add_header(
+                base_path, (include for _, include in self.iter_includes(_result, base_path))
+            )
+            if self.remove_redundant:
+                _results[base_path] = (root, _result)
+            elif not self.dry_run:
+                self.write_header(root, base_path, _result)
+
+        if self.remove_redundant:
+            redundant = self.find_redundant_includes()
+            for base_path, (root, lines) in _results.items():
+                if base_path in redundant:
+                    lines = self.remove_redundant_includes(
+                        lines, base_path, redundant[base_path]
+                    )
+                if not self.dry_run:
+                    self.write_header(root, base_path, lines)
+
+        if self.all_includes:
+            self.write_all_includes(self.all_includes)
+        if self.binder_config:
+            self.write_binder_config(self.binder_config)
 
         self.log.info("END: transforming headers in '%s' to '%s'",
             self.input_dir, self.output_dir)
 
+    def write_header(self, root: IncludeRoot, base_path: str, lines: list[str]):
+        """Write transformed header lines to the root's output_dir"""
+        header_path = os.path.join(root.output_dir, base_path)
+        with open(header_path, "w", encoding="utf-8") as fwrite:
+            fwrite.writelines(lines)
+
     def get_headers(self, sort: bool = False, from_output_dir: bool = False) -> list[str]:
-        """Retrieve all header files recursively
+        """Retrieve all header files recursively from all include roots
 
         Returns a list of header paths.
 
         Can be optionally sorted and retrieved from output_dir
         """
+        results = []
+        for root in self.roots:
+            results.extend(self._walk_headers(root, from_output_dir))
+        # roots may share (nested) output directories
+        results = list(dict.fromkeys(results))
+        if sort:
+            return sorted(results)
+        return results
+
+    def _walk_headers(self, root: IncludeRoot, from_output_dir: bool = False) -> list[str]:
+        """Retrieve header files recursively from a single include root"""
         if from_output_dir:
-            path = self.output_dir
+            path = self.get_output_path(root)
         else:
-            path = self.input_dir
+            path = root.input_dir
         results = []
-        for root, _, files in os.walk(path):
+        for dirpath, _, files in os.walk(path):
             for fname in files:
                 if any(fname.endswith(e) for e in self.header_endings):
-                    results.append(os.path.join(root, fname))
-        if sort:
-            return sorted(results)
+                    results.append(os.path.join(dirpath, fname))
         return results
 
-    def get_base_path(self, header_path: str) -> str:
-        """Returns base path, or the path which follows `self.input_dir`"""
-        path = self.input_dir
+    def get_output_path(self, root: IncludeRoot) -> str:
+        """Returns the directory to which the headers of root are written"""
+        if root.prefix:
+            return os.path.join(root.output_dir, root.prefix)
+        return root.output_dir
+
+    def get_index(self) -> dict[str, tuple[IncludeRoot, str]]:
+        """Index all headers of all include roots by base path
+
+        The index is built once and shared by all roots.
+        Returns a dict mapping base path to a (root, header path) pair.
+        """
+        if self._index is None:
+            self._index = {}
+            self._shadowed = []
+            for root in self.roots:
+                for header_path in self._walk_headers(root):
+                    base_path = self.get_base_path(header_path, root)
+                    if base_path in self._index:
+                        self.log.warning("'%s' in '%s' shadowed by '%s'",
+                            base_path, root.input_dir, self._index[base_path][1])
+                        self._shadowed.append((root, base_path))
+                        continue
+                    self._index[base_path] = (root, header_path)
+        return self._index
+
+    def _remove_shadowed_headers(self):
+        """Remove copies of shadowed headers from their root's output_dir
+
+        A shadowed header is never transformed, so its untransformed copy
+        must not be left in the output (unless the shadowing header is
+        written to the same path).
+        """
+        index = self.get_index()
+        removed = set()
+        for root, base_path in self._shadowed:
+            header_path = os.path.join(root.output_dir, base_path)
+            if header_path in removed:
+                continue  # roots sharing an output_dir
+            if header_path != os.path.join(index[base_path][0].output_dir, base_path):
+                self.log.warning("removing shadowed '%s'", header_path)
+                os.remove(header_path)
+                removed.add(header_path)
+
+    def get_base_path(self, header_path: str, root: IncludeRoot = None) -> str:  # type: ignore
+        """Returns base path, or the path which follows the root input_dir,
+        with the root prefix prepended (if any).
+        """
+        if root is None:
+            root = self.roots[0]
+        path = root.input_dir
         if not path.endswith("/"):
             path = f"{path}/"
-        return header_path[len(path) :]
+        base_path = header_path[len(path) :]
+        if root.prefix:
+            return f"{root.prefix.rstrip('/')}/{base_path}"
+        return base_path
 
     def transform(self, lines: list[str], base_path: str) -> list[str]:
         """Main tranformation pipeline
@@ -217,7 +629,7 @@ class HeaderProcessor:
             if line.startswith("#include "):
                 if line.endswith('"\n'):
                     line = line.strip()
-                    abs_ref, abs_include = self.normalize_include_statement(
+                    _, abs_include = self.normalize_include_statement(
                         line, base_path
                     )
                     _result.append(abs_include)
@@ -226,12 +638,230 @@ class HeaderProcessor:
                         line.lstrip("#include "),
                         abs_include.strip().lstrip("#include "),
                     )
-                    if HAVE_GRAPHVIZ and self.graph:
-                        self.graph.edge(base_path, abs_ref)
                     continue
             _result.append(line)
         return _result
 
+    def iter_includes(self, lines: list[str], base_path: str):
+        """Iterate over the include statements of a header.
+
+        Tracks `#if` nesting to mark conditional includes. Only an `#ifndef X`
+        followed by `#define X` as the first directive of the header counts as
+        a header guard; any other block makes its includes conditional.
+        Yields (line index, Include) pairs.
+        """
+        stack = []  # True for the header guard, False for any other `#if` block
+        seen_directive = False
+        for i, line in enumerate(lines):
+            match = self.CONDITIONAL_PATTERN.match(line)
+            if match:
+                directive = match.group(1)
+                if directive in ("if", "ifdef", "ifndef"):
+                    is_guard = False
+                    if directive == "ifndef" and not seen_directive and i + 1 < len(lines):
+                        name = line.split()[-1]
+                        is_guard = lines[i + 1].split()[:2] == ["#define", name]
+                    stack.append(is_guard)
+                elif directive == "endif" and stack:
+                    stack.pop()
+            elif line.startswith("#include "):
+                match = self.INCLUDE_PATTERN.match(line)
+                if match:
+                    delimiter, target = match.groups()
+                    if delimiter == '"':
+                        target = self.resolve_include(base_path, target)
+                    yield i, Include(target, not all(stack))
+            if line.lstrip().startswith("#"):
+                seen_directive = True
+
+    def find_redundant_includes(self) -> dict[str, dict[str, str]]:
+        """Find duplicate and transitively implied includes of processed headers.
+
+        An include is redundant if it is repeated in the same header, or if
+        an earlier include of the same header already (transitively) includes it.
+        Conditional includes are neither flagged nor considered as implying, and
+        neither are includes that (transitively) include the header itself.
+        Reachability is computed once as integer bitsets over the
+        strongly connected components of the include graph.
+
+        Returns a dict mapping a header to {redundant include: implying include},
+        where a duplicate include maps to itself.
+        """
+        include_graph = self.get_include_graph()
+        names = include_graph.names
+        reach = self._get_reachability()
+        results: dict[str, dict[str, str]] = {}
+        for node in range(include_graph.n_headers):
+            redundant: dict[str, str] = {}
+            targets: list[int] = []
+            for edge in range(*include_graph.row(node)):
+                if include_graph.conditional[edge]:
+                    continue
+                target = include_graph.targets[edge]
+                if target in targets:
+                    redundant[names[target]] = names[target]
+                else:
+                    targets.append(target)
+            for i, target in enumerate(targets):
+                # only an earlier include may imply a later one: code between
+                # them (e.g. `#ifdef`) may depend on the earlier include
+                for other in targets[:i]:
+                    if not reach[other] >> target & 1:
+                        continue
+                    # guarded re-inclusion of this header provides nothing
+                    if reach[other] >> node & 1:
+                        continue
+                    redundant[names[target]] = names[other]
+                    break
+            if redundant:
+                results[names[node]] = redundant
+        return results
+
+    def get_include_graph(self) -> IncludeGraph:
+        """Returns the compact include graph of the processed headers"""
+        if self._include_graph is None:
+            self._include_graph = IncludeGraph(self.get_index())
+        return self._include_graph
+
+    @property
+    def graph(self):
+        """graphviz graph of references between processed headers
+
+        Built once from the include graph (rebuilt after processing again).
+        Returns None if graphviz is not available.
+        """
+        if not HAVE_GRAPHVIZ:
+            return None
+        if self._graph is None:
+            self._graph = graphviz.Digraph("dependencies", comment="Header References")
+            include_graph = self.get_include_graph()
+            names = include_graph.names
+            for node in range(include_graph.n_headers):
+                for succ in include_graph.successors(node):
+                    if succ < include_graph.n_headers:
+                        self._graph.edge(names[node], names[succ])
+        return self._graph
+
+    def _get_reachability(self) -> list[int]:
+        """Compute transitive reachability over unconditional includes
+
+        Returns the bitset of node ids each node (transitively) includes.
+        """
+        include_graph = self.get_include_graph()
+        component = [-1] * len(include_graph)
+        reach_bits: list[int] = []
+        for members in include_graph.components(conditional=False):
+            for member in members:
+                component[member] = len(reach_bits)
+            bits = 0
+            for member in members:
+                for edge in range(*include_graph.row(member)):
+                    if include_graph.conditional[edge]:
+                        continue
+                    succ = include_graph.targets[edge]
+                    if component[succ] != component[member]:
+                        bits |= reach_bits[component[succ]]
+                    bits |= 1 << succ
+            reach_bits.append(bits)
+        return [reach_bits[c] for c in component]
+
+    def remove_redundant_includes(
+        self, lines: list[str], base_path: str, redundant: dict[str, str]
+    ) -> list[str]:
+        """Remove redundant include statements found by `find_redundant_includes`.
+
+        The first occurrence of a duplicate include is kept.
+        Returns a list of header lines.
+        """
+        skip = set()
+        seen = set()
+        for i, include in self.iter_includes(lines, base_path):
+            if include.conditional or include.target not in redundant:
+                continue
+            implied_by = redundant[include.target]
+            if implied_by == include.target:
+                if include.target in seen:
+                    skip.add(i)
+                    self.log.info("  removed duplicate: %s", include.target)
+                seen.add(include.target)
+            else:
+                skip.add(i)
+                self.log.info("  removed: %s (implied by %s)", include.target, implied_by)
+        return [line for i, line in enumerate(lines) if i not in skip]
+
+    def get_all_includes(self) -> list[str]:
+        """Returns processed headers in include order
+
+        Every header comes after the headers it includes (headers in an
+        include cycle are kept together). Uses the include statements collected
+        during processing, so no headers are read again.
+        """
+        include_graph = self.get_include_graph()
+        start = sorted(range(include_graph.n_headers), key=include_graph.names.__getitem__)
+        return [
+            include_graph.names[node]
+            for members in include_graph.components(start=start)
+            for node in reversed(members)
+            if node < include_graph.n_headers
+        ]
+
+    def write_all_includes(self, path: str):
+        """Write topologically sorted include statements of all processed headers"""
+        with open(path, "w", encoding="utf-8") as fwrite:
+            for base_path in self.get_all_includes():
+                fwrite.write(f"#include <{base_path}>\n")
+        self.log.info("wrote all includes to '%s'", path)
+
+    def write_binder_config(self, path: str):
+        """Write a skeleton binder config for the processed headers
+
+        Emits `+include` directives for the pybind11 type casters needed by
+        the standard library headers in use, and `-include` directives for
+        quoted includes which did not resolve to any processed header.
+        Directives which need parsed declarations are left as comments.
+        """
+        include_graph = self.get_include_graph()
+        external = include_graph.names[include_graph.n_headers :]
+        missing = sorted(self._unresolved.intersection(external))
+        external = sorted(set(external).difference(missing))
+
+        lines = ["# binder config generated by header_utils.py", "#", "# roots:"]
+        for root in self.roots:
+            line = f"#   {root.input_dir}"
+            if root.output_dir:
+                line = f"{line} -> {self.get_output_path(root)}"
+            if root.prefix:
+                line = f"{line} (prefix: {root.prefix})"
+            lines.append(line)
+        if self.all_includes:
+            lines.extend(["#", f"# all includes: {self.all_includes}"
+                f" ({include_graph.n_headers} headers)"])
+        if external:
+            lines.extend(["#", "# headers included from outside the processed roots:"])
+            lines.extend(f"#   <{name}>" for name in external)
+
+        casters = [
+            caster for caster, std_headers in self.PYBIND11_INCLUDES.items()
+            if any(name in external for name in std_headers)
+        ]
+        if casters:
+            lines.extend(["", "# type casters for the standard library headers in use"])
+            lines.extend(f"+include <{caster}>" for caster in casters)
+        if missing:
+            lines.extend(["", "# quoted includes not found in any root"])
+            lines.extend(f"-include <{name}>" for name in missing)
+        lines.extend([
+            "",
+            "# namespaces, classes and functions to bind, e.g.:",
+            "# +namespace <namespace>",
+            "# -namespace <namespace>",
+            "# -class <class>",
+            "# -function <function>",
+        ])
+        with open(path, "w", encoding="utf-8") as fwrite:
+            fwrite.writelines(f"{line}\n" for line in lines)
+        self.log.info("wrote binder config to '%s'", path)
+
     def normalize_include_statement(self, line: str, base_path: str) -> tuple[str, str]:
         """Normalize include statement.
 
@@ -242,10 +872,33 @@ class HeaderProcessor:
         match = self.PATTERN.match(line)
         if match:
             rel_ref = match.group(1)
-            abs_ref = self.convert_rel_to_abs_path_ref(base_path, rel_ref)
+            abs_ref = self.resolve_include(base_path, rel_ref)
             return (abs_ref, f"#include <{abs_ref}>\n")
         raise ValueError
 
+    def resolve_include(self, base_path: str, rel_ref: str) -> str:
+        """Resolve an include reference across all include roots.
+
+        The reference is resolved relative to the including header. If that
+        does not name an indexed header but the reference itself does (i.e. it
+        points into another root), the reference is kept as is.
+        Resolutions are cached per including directory, and references which
+        do not name any indexed header are recorded as unresolved.
+
+        Returns absolute path.
+        """
+        key = (os.path.dirname(base_path), rel_ref)
+        if key not in self._resolved:
+            abs_ref = self.convert_rel_to_abs_path_ref(base_path, rel_ref)
+            index = self.get_index()
+            if abs_ref not in index:
+                if rel_ref in index:
+                    abs_ref = rel_ref
+                else:
+                    self._unresolved.add(abs_ref)
+            self._resolved[key] = abs_ref
+        return self._resolved[key]
+
     def convert_rel_to_abs_path_ref(self, base_path: str, relative_path: str) -> str:
         """Converts relative path to absolute path
 
@@ -328,6 +981,30 @@ class HeaderProcessor:
             help="force overwrite output_dir if it already exists",
         )
 
+        option("--prefix", "-p", default="", help="include path prefix of input_dir headers")
+
+        option(
+            "--root",
+            "-r",
+            action="append",
+            metavar="INPUT_DIR[:OUTPUT_DIR[:PREFIX]]",
+            help="additional include root processed in the same pass",
+        )
+
+        option(
+            "--remove-redundant",
+            action="store_true",
+            help="remove duplicate and transitively implied includes",
+        )
+
+        option(
+            "--all-includes",
+            "-a",
+            help="output path for topologically sorted all-includes file",
+        )
+
+        option("--binder-config", "-c", help="output path for skeleton binder config")
+
         option("--list", "-l", action="store_true", help="list target headers only")
 
         option(
@@ -346,13 +1023,19 @@ class HeaderProcessor:
                 args.header_guards,
                 args.dry_run,
                 args.force_overwrite,
+                [IncludeRoot(*r.split(":", 2)) for r in args.root or []],
+                args.remove_redundant,
+                args.all_includes,
+                args.binder_config,
+                args.prefix,
             )
             if args.list:
                 app.list_target_headers()
             else:
                 app.process_headers()
-                if args.graph and app.graph:
-                    app.graph.render(outfile=args.graph)
+                graph = app.graph if args.graph else None
+                if graph:
+                    graph.render(outfile=args.graph)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""Benchmark memory use per edge of the compact include graph.
+
+Builds an `IncludeGraph` for a synthetic include tree the way
+`HeaderProcessor` does (one `add_header` call per processed header) and
+compares it against one edge string per include statement, as stored in
+the body of a `graphviz.Digraph`.
+
+usage: python tests/bench_include_graph.py [n_headers] [includes_per_header]
+"""
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from header_utils import IncludeGraph  # noqa: E402
+
+SYSTEM_HEADERS = [f"system{i}.h" for i in range(100)]
+
+
+def make_names(n_headers: int) -> list[str]:
+    return [f"lib{i % 97}/module{i}/header{i}.hpp" for i in range(n_headers)]
+
+
+def iter_includes(names: list[str], node: int, per_header: int):
+    """Yield the (target, conditional) includes of a header, like iter_includes"""
+    rng = random.Random(node)
+    for _ in range(per_header):
+        if rng.random() < 0.3:
+            yield rng.choice(SYSTEM_HEADERS), False
+        else:
+            yield rng.choice(names), rng.random() < 0.1
+
+
+def measure(func):
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = func()
+    elapsed = time.perf_counter() - start
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, size, elapsed
+
+
+def main():
+    n_headers = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+    per_header = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+    names = make_names(n_headers)
+
+    def build_graph():
+        graph = IncludeGraph(names)
+        for node, name in enumerate(names):
+            graph.add_header(name, iter_includes(names, node, per_header))
+        return graph
+
+    graph, graph_size, graph_time = measure(build_graph)
+    n_edges = graph.n_edges
+    # graphviz.Digraph.edge() appends one quoted body string per call
+    body, body_size, body_time = measure(lambda: [
+        f"\t\"{name}\" -> \"{target}\"\n"
+        for node, name in enumerate(names)
+        for target, _ in iter_includes(names, node, per_header)
+    ])
+
+    print(f"headers: {n_headers}, edges: {n_edges} (digraph body: {len(body)})")
+    print(f"IncludeGraph arrays : {graph.nbytes() / n_edges:6.1f} bytes/edge")
+    print(f"IncludeGraph total  : {graph_size / n_edges:6.1f} bytes/edge"
+          f" ({graph_time:.2f}s)")
+    print(f"digraph body strings: {body_size / len(body):6.1f} bytes/edge"
+          f" ({body_time:.2f}s)")
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = os.path.join(tmpdir, "graph.bin")
+        graph.save(path)
+        loaded, load_size, load_time = measure(lambda: IncludeGraph.load(path))
+        # only the node names are copied, the arrays stay on disk
+        print(f"mmap load           : {load_size / n_edges:6.1f} bytes/edge"
+              f" ({load_time * 1000:.1f}ms, file {os.path.getsize(path)} bytes)")
+        loaded.close()
+
+
+if __name__ == "__main__":
+    main()
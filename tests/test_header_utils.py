@@ -3,7 +3,7 @@ import shutil
 
 import pytest
 
-from header_utils import HeaderProcessor
+from header_utils import HeaderProcessor, IncludeGraph, IncludeRoot
 
 BEFORE=[
     '#include "core/executor.hpp"',
@@ -371,3 +371,249 @@ def test_process_headers():
 
     if os.path.exists(output_headers):
         shutil.rmtree(output_headers)
+
+
+def test_process_multiple_roots(tmp_path):
+    lib = tmp_path / 'lib'
+    vendor = tmp_path / 'vendor'
+    output_headers = tmp_path / 'include'
+    (lib / 'detail').mkdir(parents=True)
+    (vendor / 'fmt').mkdir(parents=True)
+    (lib / 'api.hpp').write_text(
+        '#include "detail/impl.hpp"\n#include "fmt/core.h"\n')
+    (lib / 'detail' / 'impl.hpp').write_text('#include "../../fmt/format.h"\n')
+    (vendor / 'fmt' / 'core.h').write_text('#include <string>\n')
+    (vendor / 'fmt' / 'format.h').write_text('#include "core.h"\n')
+
+    p = HeaderProcessor(
+        input_dir=str(vendor),
+        output_dir=str(output_headers),
+        roots=[IncludeRoot(str(lib), prefix='mylib')],
+    )
+    assert sorted(p.get_index()) == [
+        'fmt/core.h', 'fmt/format.h', 'mylib/api.hpp', 'mylib/detail/impl.hpp']
+    p.process_headers()
+    assert sorted(p.get_include_statements(from_output_dir=True)) == [
+        '#include <fmt/core.h>',
+        '#include <fmt/core.h>',
+        '#include <fmt/format.h>',
+        '#include <mylib/detail/impl.hpp>',
+        '#include <string>',
+    ]
+    assert (output_headers / 'mylib' / 'api.hpp').exists()
+
+
+def test_remove_redundant_includes(tmp_path):
+    input_headers = tmp_path / 'src'
+    output_headers = tmp_path / 'include'
+    (input_headers / 'lib').mkdir(parents=True)
+    (input_headers / 'lib' / 'a.hpp').write_text(
+        '#pragma once\n'
+        '#include "b.hpp"\n'
+        '#include <vector>\n'
+        '#include "c.hpp"\n'
+        '#include "b.hpp"\n'
+        '#ifdef USE_D\n'
+        '#include "d.hpp"\n'
+        '#endif\n'
+    )
+    (input_headers / 'lib' / 'b.hpp').write_text(
+        '#ifndef LIB_B_HPP\n#define LIB_B_HPP\n'
+        '#include "c.hpp"\n#include <vector>\n'
+        '#endif\n'
+    )
+    (input_headers / 'lib' / 'c.hpp').write_text('#include "b.hpp"\n')
+    (input_headers / 'lib' / 'd.hpp').write_text('#include "c.hpp"\n')
+
+    p = HeaderProcessor(
+        input_dir=str(input_headers),
+        output_dir=str(output_headers),
+        remove_redundant=True,
+    )
+    p.process_headers()
+    assert p.find_redundant_includes() == {
+        'lib/a.hpp': {
+            'lib/b.hpp': 'lib/b.hpp',
+            'vector': 'lib/b.hpp',
+            'lib/c.hpp': 'lib/b.hpp',
+        },
+    }
+    assert (output_headers / 'lib' / 'a.hpp').read_text() == (
+        '#pragma once\n'
+        '#include <lib/b.hpp>\n'
+        '#ifdef USE_D\n'
+        '#include <lib/d.hpp>\n'
+        '#endif\n'
+    )
+
+
+def test_include_graph_save_and_load(tmp_path):
+    p = HeaderProcessor(input_dir='tests/include-before', output_dir=None, dry_run=True)
+    p.process_headers()
+    graph = p.get_include_graph()
+    assert graph.n_headers == len(p.get_headers())
+    assert graph.n_edges == len(BEFORE)
+    assert graph.nbytes() == 4 * (graph.n_headers + 1) + 5 * graph.n_edges
+
+    graph.save(str(tmp_path / 'graph.bin'))
+    with IncludeGraph.load(str(tmp_path / 'graph.bin')) as loaded:
+        assert loaded.names == graph.names
+        assert loaded.n_headers == graph.n_headers
+        assert list(loaded.edges()) == list(graph.edges())
+        assert loaded.nbytes() == 4 * (len(graph) + 1) + 5 * graph.n_edges
+        executor = loaded.ids['taskflow/core/executor.hpp']
+        assert 'taskflow/core/observer.hpp' in [
+            loaded.names[succ] for succ in loaded.successors(executor)]
+    assert loaded.n_edges == 0
+    os.remove(tmp_path / 'graph.bin')
+
+
+def test_all_includes_and_binder_config(tmp_path):
+    all_includes = tmp_path / 'all_includes.hpp'
+    binder_config = tmp_path / 'config.cfg'
+    p = HeaderProcessor(
+        input_dir='tests/include-before',
+        output_dir=None,
+        dry_run=True,
+        all_includes=str(all_includes),
+        binder_config=str(binder_config),
+    )
+    p.process_headers()
+
+    lines = all_includes.read_text().splitlines()
+    assert len(lines) == len(p.get_headers())
+    order = {line[len('#include <'):-1]: i for i, line in enumerate(lines)}
+    assert order['taskflow/core/declarations.hpp'] < order['taskflow/core/graph.hpp']
+    assert order['taskflow/core/task.hpp'] < order['taskflow/algorithm/critical.hpp']
+    assert order['taskflow/core/executor.hpp'] < order['taskflow/taskflow.hpp']
+
+    config = binder_config.read_text().splitlines()
+    assert '#   tests/include-before' in config
+    assert '#   <cuda.h>' in config
+    assert '+include <pybind11/stl.h>' in config
+    assert '+include <pybind11/functional.h>' in config
+    assert '+include <pybind11/complex.h>' not in config
+    assert '-include <taskflow/sycl/sycl_flow.hpp>' in config
+    assert '#   <taskflow/sycl/sycl_flow.hpp>' not in config
+
+
+def test_shadowed_headers_are_not_copied(tmp_path):
+    first = tmp_path / 'a'
+    second = tmp_path / 'b'
+    first.mkdir()
+    second.mkdir()
+    (first / 'h.hpp').write_text('#include "x.hpp"\n')
+    (second / 'h.hpp').write_text('#include "y.hpp"\n')
+    (second / 'y.hpp').write_text('#include <string>\n')
+
+    p = HeaderProcessor(
+        input_dir=str(first),
+        output_dir=str(tmp_path / 'oa'),
+        roots=[IncludeRoot(str(second), str(tmp_path / 'ob'))],
+    )
+    p.process_headers()
+    assert (tmp_path / 'oa' / 'h.hpp').read_text() == '#include <x.hpp>\n'
+    assert not (tmp_path / 'ob' / 'h.hpp').exists()
+    assert (tmp_path / 'ob' / 'y.hpp').exists()
+
+    p.write_binder_config(str(tmp_path / 'config.cfg'))
+    config = (tmp_path / 'config.cfg').read_text().splitlines()
+    assert '-include <x.hpp>' in config
+    assert '-include <string>' not in config
+
+
+def test_shadowed_headers_in_shared_output_dir(tmp_path):
+    for name in 'abc':
+        (tmp_path / name).mkdir()
+        (tmp_path / name / 'h.hpp').write_text(f'#include "{name}.hpp"\n')
+
+    p = HeaderProcessor(
+        input_dir=str(tmp_path / 'a'),
+        output_dir=str(tmp_path / 'oa'),
+        roots=[
+            IncludeRoot(str(tmp_path / 'b'), str(tmp_path / 'ob')),
+            IncludeRoot(str(tmp_path / 'c'), str(tmp_path / 'ob')),
+        ],
+    )
+    p.process_headers()
+    assert (tmp_path / 'oa' / 'h.hpp').read_text() == '#include <a.hpp>\n'
+    assert not (tmp_path / 'ob' / 'h.hpp').exists()
+
+
+def test_redundant_includes_implied_by_earlier_includes_only(tmp_path):
+    input_headers = tmp_path / 'src'
+    input_headers.mkdir()
+    (input_headers / 'config.hpp').write_text('#define USE_FAST\n')
+    (input_headers / 'b.hpp').write_text('#include "config.hpp"\n')
+    (input_headers / 'a.hpp').write_text(
+        '#include "config.hpp"\n'
+        '#ifdef USE_FAST\n'
+        'int fast();\n'
+        '#endif\n'
+        '#include "b.hpp"\n'
+    )
+    (input_headers / 'c.hpp').write_text(
+        '#include "b.hpp"\n'
+        'int c();\n'
+        '#include "config.hpp"\n'
+    )
+
+    p = HeaderProcessor(input_dir=str(input_headers), output_dir=None, dry_run=True)
+    p.process_headers()
+    assert p.find_redundant_includes() == {'c.hpp': {'config.hpp': 'b.hpp'}}
+
+
+@pytest.mark.parametrize('block, expected', [
+    ('#include "b.hpp"\n', {'a.hpp': {'c.hpp': 'b.hpp'}}),
+    ('  #ifdef X\n#include "b.hpp"\n  #endif\n', {}),
+    ('#ifndef USE_DEFAULT_CFG\n#define USE_DEFAULT_CFG\n#include "b.hpp"\n#endif\n', {}),
+])
+def test_redundant_includes_ignore_conditional_blocks(tmp_path, block, expected):
+    input_headers = tmp_path / 'src'
+    input_headers.mkdir()
+    (input_headers / 'b.hpp').write_text('#include "c.hpp"\n')
+    (input_headers / 'c.hpp').write_text('int c();\n')
+    (input_headers / 'a.hpp').write_text(
+        '#ifndef A_HPP\n#define A_HPP\n'
+        '#include <vector>\n'
+        + block +
+        '#include "c.hpp"\n'
+        '#endif\n'
+    )
+
+    p = HeaderProcessor(input_dir=str(input_headers), output_dir=None, dry_run=True)
+    p.process_headers()
+    assert p.find_redundant_includes() == expected
+
+
+def test_transform_has_no_side_effects(tmp_path):
+    (tmp_path / 'lib').mkdir()
+    (tmp_path / 'lib' / 'a.hpp').write_text('#include "b.hpp"\n')
+    p = HeaderProcessor(input_dir=str(tmp_path), output_dir=None, dry_run=True)
+    p.process_headers()
+    n_edges = p.get_include_graph().n_edges
+    lines = ['#include "b.hpp"\n']
+    assert p.transform(lines, 'lib/a.hpp') == ['#include <lib/b.hpp>\n']
+    assert p.transform(lines, 'other/x.hpp') == ['#include <other/b.hpp>\n']
+    assert p.get_include_graph().n_edges == n_edges
+
+
+def test_prefix_and_reprocessing(tmp_path):
+    input_headers = tmp_path / 'src'
+    input_headers.mkdir()
+    (input_headers / 'a.hpp').write_text('#include "b.hpp"\n')
+
+    p = HeaderProcessor(
+        input_dir=str(input_headers),
+        output_dir=str(tmp_path / 'include'),
+        force_overwrite=True,
+        prefix='mylib',
+    )
+    p.process_headers()
+    assert (tmp_path / 'include' / 'mylib' / 'a.hpp').read_text() == (
+        '#include <mylib/b.hpp>\n')
+
+    (input_headers / 'b.hpp').write_text('#include <string>\n')
+    p.process_headers()
+    assert sorted(p.get_index()) == ['mylib/a.hpp', 'mylib/b.hpp']
+    assert p.get_include_graph().n_headers == 2